@@ -6,68 +6,85 @@ Centralized configuration loading from .env file.
 All services import settings from this module.
 """
 
+import functools
 import os
+from dataclasses import dataclass
 from pathlib import Path
 from dotenv import load_dotenv
 
-# Load .env file from project root
 PROJECT_ROOT = Path(__file__).parent
-load_dotenv(PROJECT_ROOT / '.env')
 
+# Set once the .env file has been parsed. Child services inherit both the
+# parsed variables and this marker, so they skip re-reading the file.
+_DOTENV_MARKER = '_HFT_DOTENV_LOADED'
 
+
+def _load_dotenv_once():
+    """Load the project .env file at most once per process tree."""
+    if not os.environ.get(_DOTENV_MARKER):
+        load_dotenv(PROJECT_ROOT / '.env')
+        os.environ[_DOTENV_MARKER] = '1'
+
+
+@dataclass(frozen=True, slots=True)
 class Config:
     """Application configuration loaded from environment variables."""
     
     # ----- Database -----
-    TURSO_URL: str = os.getenv('TURSO_URL', '')
-    TURSO_TOKEN: str = os.getenv('TURSO_TOKEN', '')
+    TURSO_URL: str
+    TURSO_TOKEN: str
     
     # ----- Gemini AI -----
-    GEMINI_API_KEYS: list = [
-        os.getenv('GEMINI_API_KEY_1', ''),
-        os.getenv('GEMINI_API_KEY_2', ''),
-    ]
-    GEMINI_MODELS: list = [
-        "gemini-2.5-flash",
-        "gemini-2.5-flash-lite",
-        "gemini-2.0-flash",
-    ]
+    GEMINI_API_KEYS: tuple
+    GEMINI_MODELS: tuple
     
     # ----- Trading -----
-    SYMBOL: str = os.getenv('TRADING_SYMBOL', 'TATASTEEL.NS')
-    INITIAL_BALANCE: float = float(os.getenv('INITIAL_BALANCE', '100000'))
+    SYMBOL: str
+    INITIAL_BALANCE: float
     
     # ----- Service Intervals -----
-    MARKET_FEEDER_INTERVAL: int = int(os.getenv('MARKET_FEEDER_INTERVAL', '60'))
-    QUANT_ENGINE_INTERVAL: int = int(os.getenv('QUANT_ENGINE_INTERVAL', '60'))
-    EXECUTION_ENGINE_INTERVAL: int = int(os.getenv('EXECUTION_ENGINE_INTERVAL', '10'))
-    GEMINI_MANAGER_INTERVAL: int = int(os.getenv('GEMINI_MANAGER_INTERVAL', '300'))
+    MARKET_FEEDER_INTERVAL: int
+    QUANT_ENGINE_INTERVAL: int
+    QUANT_POLL_INTERVAL: float
+    EXECUTION_ENGINE_INTERVAL: int
+    GEMINI_MANAGER_INTERVAL: int
     
     # ----- Model Parameters -----
-    RSI_WINDOW: int = int(os.getenv('RSI_WINDOW', '14'))
-    SMA_WINDOW: int = int(os.getenv('SMA_WINDOW', '20'))
-    MIN_TRAINING_ROWS: int = int(os.getenv('MIN_TRAINING_ROWS', '200'))
-    XGBOOST_ESTIMATORS: int = int(os.getenv('XGBOOST_ESTIMATORS', '100'))
-    XGBOOST_MAX_DEPTH: int = int(os.getenv('XGBOOST_MAX_DEPTH', '3'))
-    XGBOOST_LEARNING_RATE: float = float(os.getenv('XGBOOST_LEARNING_RATE', '0.1'))
+    MODEL_KIND: str
+    RSI_WINDOW: int
+    SMA_WINDOW: int
+    MIN_TRAINING_ROWS: int
+    TRAINING_WINDOW: int
+    XGBOOST_ESTIMATORS: int
+    XGBOOST_MAX_DEPTH: int
+    XGBOOST_LEARNING_RATE: float
+    XGBOOST_MAX_BIN: int
+    XGBOOST_MAX_TREES: int
+    RETRAIN_INTERVAL: int
+    RETRAIN_TREES: int
+    INFERENCE_BACKEND: str
     
     # ----- Risk Management -----
-    MAX_CAPITAL_LOSS_PERCENT: float = float(os.getenv('MAX_CAPITAL_LOSS_PERCENT', '2'))
-    MAX_TRADES_PER_10_MIN: int = int(os.getenv('MAX_TRADES_PER_10_MIN', '5'))
+    MAX_CAPITAL_LOSS_PERCENT: float
+    MAX_TRADES_PER_10_MIN: int
+    
+    # ----- Database Writes -----
+    PRICE_FLUSH_TICKS: int
     
     # ----- File Paths -----
-    SIGNAL_FILE: str = str(PROJECT_ROOT / 'trade_signal.json')
+    SIGNAL_FILE: str
+    WARMUP_CACHE_DIR: str
+    MODEL_FILE: str
     
-    @classmethod
-    def validate(cls) -> bool:
+    def validate(self) -> bool:
         """Validate required configuration is present."""
         errors = []
         
-        if not cls.TURSO_URL:
+        if not self.TURSO_URL:
             errors.append("TURSO_URL is not set")
-        if not cls.TURSO_TOKEN:
+        if not self.TURSO_TOKEN:
             errors.append("TURSO_TOKEN is not set")
-        if not any(cls.GEMINI_API_KEYS):
+        if not any(self.GEMINI_API_KEYS):
             errors.append("No GEMINI_API_KEY is set")
         
         if errors:
@@ -78,30 +95,91 @@ class Config:
         
         return True
     
-    @classmethod
-    def print_config(cls):
+    def print_config(self):
         """Print current configuration (redacted secrets)."""
         print("=" * 50)
         print("  GEMINI HFT SYSTEM - Configuration")
         print("=" * 50)
-        print(f"  Symbol:         {cls.SYMBOL}")
-        print(f"  Initial Balance: ₹{cls.INITIAL_BALANCE:,.2f}")
-        print(f"  Database:       {'Connected' if cls.TURSO_URL else 'Not Set'}")
-        print(f"  Gemini APIs:    {sum(1 for k in cls.GEMINI_API_KEYS if k)} configured")
+        print(f"  Symbol:         {self.SYMBOL}")
+        print(f"  Initial Balance: ₹{self.INITIAL_BALANCE:,.2f}")
+        print(f"  Database:       {'Connected' if self.TURSO_URL else 'Not Set'}")
+        print(f"  Gemini APIs:    {sum(1 for k in self.GEMINI_API_KEYS if k)} configured")
         print("-" * 50)
-        print(f"  Market Feeder:  {cls.MARKET_FEEDER_INTERVAL}s interval")
-        print(f"  Quant Engine:   {cls.QUANT_ENGINE_INTERVAL}s interval")
-        print(f"  Execution:      {cls.EXECUTION_ENGINE_INTERVAL}s interval")
-        print(f"  Gemini Manager: {cls.GEMINI_MANAGER_INTERVAL}s interval")
+        print(f"  Market Feeder:  {self.MARKET_FEEDER_INTERVAL}s interval")
+        print(f"  Quant Engine:   on new ticks, >= {self.QUANT_ENGINE_INTERVAL}s apart (polled every {self.QUANT_POLL_INTERVAL}s)")
+        print(f"  Execution:      {self.EXECUTION_ENGINE_INTERVAL}s interval")
+        print(f"  Gemini Manager: {self.GEMINI_MANAGER_INTERVAL}s interval")
         print("-" * 50)
-        print(f"  RSI Window:     {cls.RSI_WINDOW}")
-        print(f"  SMA Window:     {cls.SMA_WINDOW}")
-        print(f"  XGBoost Trees:  {cls.XGBOOST_ESTIMATORS}")
+        print(f"  Model:          {self.MODEL_KIND}")
+        print(f"  RSI Window:     {self.RSI_WINDOW}")
+        print(f"  SMA Window:     {self.SMA_WINDOW}")
+        print(f"  XGBoost Trees:  {self.XGBOOST_ESTIMATORS} (+{self.RETRAIN_TREES} every {self.RETRAIN_INTERVAL} bars)")
+        print(f"  Inference:      {self.INFERENCE_BACKEND}")
         print("=" * 50)
 
 
+@functools.lru_cache(maxsize=1)
+def load_config() -> Config:
+    """Parse the environment into a Config (cached for the process lifetime)."""
+    _load_dotenv_once()
+    return Config(
+        # Database
+        TURSO_URL=os.getenv('TURSO_URL', ''),
+        TURSO_TOKEN=os.getenv('TURSO_TOKEN', ''),
+        
+        # Gemini AI
+        GEMINI_API_KEYS=(
+            os.getenv('GEMINI_API_KEY_1', ''),
+            os.getenv('GEMINI_API_KEY_2', ''),
+        ),
+        GEMINI_MODELS=(
+            "gemini-2.5-flash",
+            "gemini-2.5-flash-lite",
+            "gemini-2.0-flash",
+        ),
+        
+        # Trading
+        SYMBOL=os.getenv('TRADING_SYMBOL', 'TATASTEEL.NS'),
+        INITIAL_BALANCE=float(os.getenv('INITIAL_BALANCE', '100000')),
+        
+        # Service Intervals
+        MARKET_FEEDER_INTERVAL=int(os.getenv('MARKET_FEEDER_INTERVAL', '60')),
+        QUANT_ENGINE_INTERVAL=int(os.getenv('QUANT_ENGINE_INTERVAL', '60')),
+        QUANT_POLL_INTERVAL=float(os.getenv('QUANT_POLL_INTERVAL', '5')),
+        EXECUTION_ENGINE_INTERVAL=int(os.getenv('EXECUTION_ENGINE_INTERVAL', '10')),
+        GEMINI_MANAGER_INTERVAL=int(os.getenv('GEMINI_MANAGER_INTERVAL', '300')),
+        
+        # Model Parameters
+        MODEL_KIND=os.getenv('MODEL_KIND', 'xgboost').lower(),
+        RSI_WINDOW=int(os.getenv('RSI_WINDOW', '14')),
+        SMA_WINDOW=int(os.getenv('SMA_WINDOW', '20')),
+        MIN_TRAINING_ROWS=int(os.getenv('MIN_TRAINING_ROWS', '200')),
+        TRAINING_WINDOW=int(os.getenv('TRAINING_WINDOW', '500')),
+        XGBOOST_ESTIMATORS=int(os.getenv('XGBOOST_ESTIMATORS', '100')),
+        XGBOOST_MAX_DEPTH=int(os.getenv('XGBOOST_MAX_DEPTH', '3')),
+        XGBOOST_LEARNING_RATE=float(os.getenv('XGBOOST_LEARNING_RATE', '0.1')),
+        XGBOOST_MAX_BIN=int(os.getenv('XGBOOST_MAX_BIN', '64')),
+        XGBOOST_MAX_TREES=int(os.getenv('XGBOOST_MAX_TREES', '300')),
+        RETRAIN_INTERVAL=int(os.getenv('RETRAIN_INTERVAL', '5')),
+        RETRAIN_TREES=int(os.getenv('RETRAIN_TREES', '10')),
+        INFERENCE_BACKEND=os.getenv('INFERENCE_BACKEND', 'xgboost').lower(),
+        
+        # Risk Management
+        MAX_CAPITAL_LOSS_PERCENT=float(os.getenv('MAX_CAPITAL_LOSS_PERCENT', '2')),
+        MAX_TRADES_PER_10_MIN=int(os.getenv('MAX_TRADES_PER_10_MIN', '5')),
+        
+        # Database Writes
+        PRICE_FLUSH_TICKS=int(os.getenv('PRICE_FLUSH_TICKS', '1')),
+        
+        # File Paths
+        SIGNAL_FILE=str(PROJECT_ROOT / 'trade_signal.json'),
+        WARMUP_CACHE_DIR=str(PROJECT_ROOT / 'cache'),
+        MODEL_FILE=str(PROJECT_ROOT / 'quant_model'),
+    )
+
+
 # Singleton config instance
-config = Config()
+config = load_config()
 
 
 if __name__ == "__main__":
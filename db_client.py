@@ -8,8 +8,11 @@ Provides persistent storage for market data, trades, portfolio, and manager stat
 Part of the HFT Microservices Trading Bot.
 """
 
+import os
+import time
+from collections import deque
 from datetime import datetime
-from typing import Dict, Optional
+from typing import Dict, Iterator, List, Optional, Tuple
 
 import libsql_experimental as libsql
 import pandas as pd
@@ -17,6 +20,97 @@ import pandas as pd
 from config import config
 
 
+# Set once the schema exists. Services spawned by the dashboard inherit it
+# and skip the CREATE TABLE / seed-row probes on startup.
+_DB_INIT_MARKER = '_HFT_DB_INITIALIZED'
+
+# Timestamps are stored as INTEGER epoch milliseconds (UTC) and only
+# formatted when displayed.
+_TABLES = {
+    'market_data': """
+        CREATE TABLE IF NOT EXISTS market_data (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            timestamp INTEGER NOT NULL,
+            symbol TEXT NOT NULL,
+            price REAL NOT NULL,
+            volume REAL DEFAULT 0
+        )
+    """,
+    'trade_logs': """
+        CREATE TABLE IF NOT EXISTS trade_logs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            timestamp INTEGER NOT NULL,
+            action TEXT NOT NULL,
+            price REAL NOT NULL,
+            quantity INTEGER NOT NULL,
+            balance REAL NOT NULL
+        )
+    """,
+    'portfolio': """
+        CREATE TABLE IF NOT EXISTS portfolio (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            balance REAL NOT NULL DEFAULT 100000,
+            positions INTEGER NOT NULL DEFAULT 0,
+            last_trade_time TEXT
+        )
+    """,
+    'manager_status': """
+        CREATE TABLE IF NOT EXISTS manager_status (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            action TEXT NOT NULL DEFAULT 'CONTINUE',
+            reason TEXT,
+            timestamp INTEGER
+        )
+    """,
+}
+
+# Format of the old TEXT timestamps (client local time from datetime.now())
+_LEGACY_TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# Runtime statements, kept together so each query is defined in one place.
+# One-off schema and maintenance SQL stays inline in init_db/reset_db.
+_SQL_LOG_PRICE = "INSERT INTO market_data (timestamp, symbol, price, volume) VALUES (?, ?, ?, ?)"
+_SQL_PRICES_BY_SYMBOL = "SELECT timestamp, symbol, price, volume FROM market_data WHERE symbol = ? ORDER BY id DESC LIMIT ?"
+_SQL_PRICES = "SELECT timestamp, symbol, price, volume FROM market_data ORDER BY id DESC LIMIT ?"
+_SQL_PRICE_ROWS_BY_SYMBOL = "SELECT timestamp, price, volume FROM market_data WHERE symbol = ? ORDER BY id DESC LIMIT ?"
+_SQL_PRICES_SINCE = "SELECT timestamp, price, volume FROM market_data WHERE symbol = ? AND timestamp > ? ORDER BY timestamp"
+_SQL_MAX_PRICE_TS = "SELECT MAX(timestamp) FROM market_data WHERE symbol = ?"
+_SQL_LATEST_PRICE_BY_SYMBOL = "SELECT timestamp, price FROM market_data WHERE symbol = ? ORDER BY id DESC LIMIT 1"
+_SQL_LATEST_PRICE = "SELECT timestamp, price FROM market_data ORDER BY id DESC LIMIT 1"
+_SQL_GET_PORTFOLIO = "SELECT balance, positions, last_trade_time FROM portfolio WHERE id = 1"
+_SQL_UPDATE_PORTFOLIO = "UPDATE portfolio SET balance = ?, positions = ?, last_trade_time = ? WHERE id = 1"
+_SQL_LOG_TRADE = "INSERT INTO trade_logs (timestamp, action, price, quantity, balance) VALUES (?, ?, ?, ?, ?)"
+_SQL_RECENT_TRADES = "SELECT timestamp, action, price, quantity, balance FROM trade_logs ORDER BY id DESC LIMIT ?"
+_SQL_MANAGER_STATUS = "SELECT action, reason, timestamp FROM manager_status WHERE id = 1"
+_SQL_MANAGER_ACTION = "SELECT action FROM manager_status WHERE id = 1"
+_SQL_SET_MANAGER_STATUS = "UPDATE manager_status SET action = ?, reason = ?, timestamp = ? WHERE id = 1"
+_SQL_DASHBOARD_SNAPSHOT = """
+    SELECT
+        (SELECT price FROM market_data WHERE symbol = ? ORDER BY id DESC LIMIT 1),
+        p.balance, p.positions, m.action, m.reason
+    FROM portfolio p, manager_status m
+    WHERE p.id = 1 AND m.id = 1
+"""
+_SQL_CHANGE_SENTINEL = """
+    SELECT
+        (SELECT MAX(id) FROM market_data),
+        (SELECT MAX(id) FROM trade_logs),
+        (SELECT timestamp FROM manager_status WHERE id = 1)
+"""
+
+
+def _legacy_to_ms(timestamp: Optional[str]) -> Optional[int]:
+    """Old local-time TEXT timestamp to epoch ms (None stays None)."""
+    if timestamp is None:
+        return None
+    return int(datetime.strptime(timestamp, _LEGACY_TIMESTAMP_FORMAT).timestamp() * 1000)
+
+
+def _now_ms() -> int:
+    """Current time as integer epoch milliseconds."""
+    return time.time_ns() // 1_000_000
+
+
 class TradingDB:
     """Production-ready database client for trading system using Turso DB."""
     
@@ -41,50 +135,37 @@ class TradingDB:
             raise ValueError("TURSO_URL and TURSO_TOKEN must be configured in .env")
         
         self.conn = libsql.connect(database=self.url, auth_token=self.token)
+        self._price_buffer = deque()
         self._initialized = True
         print(f"[DB] Connected to Turso database")
     
     def init_db(self):
         """Create all required tables if they don't exist."""
         
-        self.conn.execute("""
-            CREATE TABLE IF NOT EXISTS market_data (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                timestamp TEXT NOT NULL,
-                symbol TEXT NOT NULL,
-                price REAL NOT NULL,
-                volume REAL DEFAULT 0
-            )
-        """)
+        # WAL lets readers run alongside the writer; NORMAL skips the fsync
+        # on every commit (still durable at checkpoints).
+        try:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+        except Exception as e:
+            print(f"[DB] Pragma skipped: {e}")
         
-        self.conn.execute("""
-            CREATE TABLE IF NOT EXISTS trade_logs (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                timestamp TEXT NOT NULL,
-                action TEXT NOT NULL,
-                price REAL NOT NULL,
-                quantity INTEGER NOT NULL,
-                balance REAL NOT NULL
-            )
-        """)
+        if os.environ.get(_DB_INIT_MARKER):
+            return
         
-        self.conn.execute("""
-            CREATE TABLE IF NOT EXISTS portfolio (
-                id INTEGER PRIMARY KEY CHECK (id = 1),
-                balance REAL NOT NULL DEFAULT 100000,
-                positions INTEGER NOT NULL DEFAULT 0,
-                last_trade_time TEXT
-            )
-        """)
+        self._migrate_timestamps()
         
-        self.conn.execute("""
-            CREATE TABLE IF NOT EXISTS manager_status (
-                id INTEGER PRIMARY KEY CHECK (id = 1),
-                action TEXT NOT NULL DEFAULT 'CONTINUE',
-                reason TEXT,
-                timestamp TEXT
-            )
-        """)
+        for ddl in _TABLES.values():
+            self.conn.execute(ddl)
+        
+        # Serves the per-symbol "latest N ticks" lookups without a table scan
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_market_symbol_id ON market_data(symbol, id DESC)"
+        )
+        # Serves the quant engine's "ticks since T" polling
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_market_symbol_ts ON market_data(symbol, timestamp)"
+        )
         
         # Initialize portfolio
         result = self.conn.execute("SELECT COUNT(*) FROM portfolio").fetchone()
@@ -99,50 +180,168 @@ class TradingDB:
         if result[0] == 0:
             self.conn.execute(
                 "INSERT INTO manager_status (id, action, timestamp) VALUES (1, 'CONTINUE', ?)",
-                (datetime.now().strftime('%Y-%m-%d %H:%M:%S'),)
+                (_now_ms(),)
             )
         
         self.conn.commit()
+        os.environ[_DB_INIT_MARKER] = '1'
         print("[DB] Tables initialized")
     
+    def _migrate_timestamps(self):
+        """
+        Rebuild tables created with TEXT timestamps to store epoch ms.
+        
+        Rows are converted before the schema is touched, and the rename /
+        create / copy / drop runs in one transaction, so a failure leaves the
+        old table as it was. A {table}_legacy left by an older, interrupted
+        migration is finished here, or reported if it can't be done safely.
+        """
+        for table, ddl in _TABLES.items():
+            legacy = f"{table}_legacy"
+            leftover = self._table_exists(legacy)
+            source = legacy if leftover else table
+            
+            columns = self.conn.execute(f"PRAGMA table_info({source})").fetchall()
+            if not any(c[1] == 'timestamp' and c[2].upper() == 'TEXT' for c in columns):
+                continue
+            
+            if leftover and self._table_exists(table) and \
+                    self.conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]:
+                raise RuntimeError(
+                    f"{legacy} holds unmigrated rows but {table} already has new data; "
+                    f"merge or drop one of them before starting the services"
+                )
+            
+            # Converted here rather than with SQL strftime(): the rows hold the
+            # client's local time, and the Turso server doesn't share its zone
+            names = [c[1] for c in columns]
+            ts_idx = names.index('timestamp')
+            rows = [list(row) for row in self.conn.execute(
+                f"SELECT {', '.join(names)} FROM {source}"
+            ).fetchall()]
+            try:
+                for row in rows:
+                    row[ts_idx] = _legacy_to_ms(row[ts_idx])
+            except ValueError as e:
+                raise RuntimeError(f"Cannot migrate {table} timestamps: {e}") from e
+            
+            self.conn.commit()
+            try:
+                self.conn.execute("BEGIN")
+                if leftover:
+                    self.conn.execute(f"DROP TABLE IF EXISTS {table}")
+                else:
+                    self.conn.execute(f"ALTER TABLE {table} RENAME TO {legacy}")
+                self.conn.execute(ddl)
+                if rows:
+                    self.conn.executemany(
+                        f"INSERT INTO {table} ({', '.join(names)}) VALUES ({', '.join('?' * len(names))})",
+                        rows
+                    )
+                self.conn.execute(f"DROP TABLE {legacy}")
+                self.conn.commit()
+            except Exception:
+                self.conn.rollback()
+                raise
+            print(f"[DB] Migrated {table} timestamps to epoch ms")
+    
+    def _table_exists(self, name: str) -> bool:
+        return self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)
+        ).fetchone() is not None
+    
     # ==================== MARKET DATA ====================
     
     def log_price(self, symbol: str, price: float, volume: float = 0) -> bool:
+        """Buffer a tick; written out every PRICE_FLUSH_TICKS ticks."""
+        timestamp = _now_ms()
+        self._price_buffer.append((timestamp, symbol, price, volume))
+        if len(self._price_buffer) >= config.PRICE_FLUSH_TICKS:
+            return self.flush_prices()
+        return True
+    
+    def flush_prices(self) -> bool:
+        """Write all buffered ticks in a single transaction."""
+        if not self._price_buffer:
+            return True
         try:
-            timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            self.conn.execute(
-                "INSERT INTO market_data (timestamp, symbol, price, volume) VALUES (?, ?, ?, ?)",
-                (timestamp, symbol, price, volume)
-            )
+            self.conn.executemany(_SQL_LOG_PRICE, list(self._price_buffer))
             self.conn.commit()
+            self._price_buffer.clear()
             return True
         except Exception as e:
-            print(f"[DB ERROR] log_price: {e}")
+            print(f"[DB ERROR] flush_prices: {e}")
             return False
     
     def get_latest_prices(self, limit: int = 500, symbol: str = None) -> pd.DataFrame:
         try:
             if symbol:
-                query = "SELECT timestamp, symbol, price, volume FROM market_data WHERE symbol = ? ORDER BY id DESC LIMIT ?"
-                result = self.conn.execute(query, (symbol, limit)).fetchall()
+                result = self.conn.execute(_SQL_PRICES_BY_SYMBOL, (symbol, limit)).fetchall()
             else:
-                query = "SELECT timestamp, symbol, price, volume FROM market_data ORDER BY id DESC LIMIT ?"
-                result = self.conn.execute(query, (limit,)).fetchall()
+                result = self.conn.execute(_SQL_PRICES, (limit,)).fetchall()
             
             df = pd.DataFrame(result, columns=['timestamp', 'symbol', 'price', 'volume'])
-            df['timestamp'] = pd.to_datetime(df['timestamp'])
+            df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms', utc=True)
             return df.iloc[::-1].reset_index(drop=True)
         except Exception as e:
             print(f"[DB ERROR] get_latest_prices: {e}")
             return pd.DataFrame(columns=['timestamp', 'symbol', 'price', 'volume'])
     
+    def get_latest_price_rows(self, limit: int, symbol: str) -> List[Tuple[int, float, float]]:
+        """Latest (timestamp, price, volume) tuples for a symbol, oldest first."""
+        try:
+            rows = self.conn.execute(_SQL_PRICE_ROWS_BY_SYMBOL, (symbol, limit)).fetchall()
+            return list(reversed(rows))
+        except Exception as e:
+            print(f"[DB ERROR] get_latest_price_rows: {e}")
+            return []
+    
+    def get_prices_since(self, since_ms: int, symbol: str) -> List[Tuple[int, float, float]]:
+        """(timestamp, price, volume) tuples for a symbol newer than since_ms, oldest first."""
+        try:
+            return self.conn.execute(_SQL_PRICES_SINCE, (symbol, since_ms)).fetchall()
+        except Exception as e:
+            print(f"[DB ERROR] get_prices_since: {e}")
+            return []
+    
+    def listen_prices(self, symbol: str, poll_interval: float) -> Iterator[int]:
+        """
+        Yield the newest tick timestamp for a symbol each time a new one lands.
+        
+        libsql has no LISTEN/NOTIFY, so this polls an indexed MAX(timestamp)
+        sentinel and only sleeps while it is unchanged.
+        """
+        last = None
+        while True:
+            try:
+                latest = self.conn.execute(_SQL_MAX_PRICE_TS, (symbol,)).fetchone()[0]
+            except Exception as e:
+                print(f"[DB ERROR] listen_prices: {e}")
+                latest = None
+            
+            if latest is not None and latest != last:
+                last = latest
+                yield latest
+            else:
+                time.sleep(poll_interval)
+    
+    def get_latest_price_scalar(self, symbol: str = None) -> Optional[Tuple[int, float]]:
+        """Latest (timestamp, price) as a plain tuple - no DataFrame overhead."""
+        try:
+            if symbol:
+                row = self.conn.execute(_SQL_LATEST_PRICE_BY_SYMBOL, (symbol,)).fetchone()
+            else:
+                row = self.conn.execute(_SQL_LATEST_PRICE).fetchone()
+            return (row[0], float(row[1])) if row else None
+        except Exception as e:
+            print(f"[DB ERROR] get_latest_price_scalar: {e}")
+            return None
+    
     # ==================== PORTFOLIO ====================
     
     def get_portfolio(self) -> Dict:
         try:
-            result = self.conn.execute(
-                "SELECT balance, positions, last_trade_time FROM portfolio WHERE id = 1"
-            ).fetchone()
+            result = self.conn.execute(_SQL_GET_PORTFOLIO).fetchone()
             if result:
                 return {'balance': result[0], 'positions': result[1], 'last_trade_time': result[2]}
             return {'balance': config.INITIAL_BALANCE, 'positions': 0, 'last_trade_time': None}
@@ -153,7 +352,7 @@ class TradingDB:
     def update_portfolio(self, balance: float, positions: int, last_trade_time: str = None) -> bool:
         try:
             self.conn.execute(
-                "UPDATE portfolio SET balance = ?, positions = ?, last_trade_time = ? WHERE id = 1",
+                _SQL_UPDATE_PORTFOLIO,
                 (balance, positions, last_trade_time)
             )
             self.conn.commit()
@@ -166,9 +365,9 @@ class TradingDB:
     
     def log_trade(self, action: str, price: float, quantity: int, balance: float) -> bool:
         try:
-            timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            timestamp = _now_ms()
             self.conn.execute(
-                "INSERT INTO trade_logs (timestamp, action, price, quantity, balance) VALUES (?, ?, ?, ?, ?)",
+                _SQL_LOG_TRADE,
                 (timestamp, action, price, quantity, balance)
             )
             self.conn.commit()
@@ -177,21 +376,51 @@ class TradingDB:
             print(f"[DB ERROR] log_trade: {e}")
             return False
     
+    def log_trade_and_update_portfolio(self, action: str, price: float, quantity: int,
+                                       balance: float, positions: int,
+                                       last_trade_time: str = None) -> bool:
+        """Log a trade and update the portfolio in one transaction (one commit)."""
+        try:
+            timestamp = _now_ms()
+            self.conn.execute(
+                _SQL_LOG_TRADE,
+                (timestamp, action, price, quantity, balance)
+            )
+            self.conn.execute(
+                _SQL_UPDATE_PORTFOLIO,
+                (balance, positions, last_trade_time)
+            )
+            self.conn.commit()
+            return True
+        except Exception as e:
+            self.conn.rollback()
+            print(f"[DB ERROR] log_trade_and_update_portfolio: {e}")
+            return False
+    
     def get_recent_trades(self, limit: int = 10) -> pd.DataFrame:
         try:
-            query = "SELECT timestamp, action, price, quantity, balance FROM trade_logs ORDER BY id DESC LIMIT ?"
-            result = self.conn.execute(query, (limit,)).fetchall()
+            result = self.conn.execute(_SQL_RECENT_TRADES, (limit,)).fetchall()
             df = pd.DataFrame(result, columns=['timestamp', 'action', 'price', 'quantity', 'balance'])
+            df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms', utc=True)
             return df.iloc[::-1].reset_index(drop=True)
         except Exception as e:
             print(f"[DB ERROR] get_recent_trades: {e}")
             return pd.DataFrame(columns=['timestamp', 'action', 'price', 'quantity', 'balance'])
     
+    def get_recent_trade_rows(self, limit: int = 10) -> List[Tuple]:
+        """Recent trades as raw (timestamp, action, price, quantity, balance) tuples, oldest first."""
+        try:
+            rows = self.conn.execute(_SQL_RECENT_TRADES, (limit,)).fetchall()
+            return list(reversed(rows))
+        except Exception as e:
+            print(f"[DB ERROR] get_recent_trade_rows: {e}")
+            return []
+    
     # ==================== MANAGER STATUS ====================
     
     def get_manager_status(self) -> str:
         try:
-            result = self.conn.execute("SELECT action FROM manager_status WHERE id = 1").fetchone()
+            result = self.conn.execute(_SQL_MANAGER_ACTION).fetchone()
             return result[0].upper() if result else 'CONTINUE'
         except Exception as e:
             print(f"[DB ERROR] get_manager_status: {e}")
@@ -199,9 +428,7 @@ class TradingDB:
     
     def get_manager_status_full(self) -> Dict:
         try:
-            result = self.conn.execute(
-                "SELECT action, reason, timestamp FROM manager_status WHERE id = 1"
-            ).fetchone()
+            result = self.conn.execute(_SQL_MANAGER_STATUS).fetchone()
             if result:
                 return {'action': result[0].upper(), 'reason': result[1], 'timestamp': result[2]}
             return {'action': 'CONTINUE', 'reason': None, 'timestamp': None}
@@ -211,9 +438,9 @@ class TradingDB:
     
     def set_manager_status(self, action: str, reason: str = None) -> bool:
         try:
-            timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            timestamp = _now_ms()
             self.conn.execute(
-                "UPDATE manager_status SET action = ?, reason = ?, timestamp = ? WHERE id = 1",
+                _SQL_SET_MANAGER_STATUS,
                 (action.upper(), reason, timestamp)
             )
             self.conn.commit()
@@ -222,6 +449,40 @@ class TradingDB:
             print(f"[DB ERROR] set_manager_status: {e}")
             return False
     
+    # ==================== DASHBOARD ====================
+    
+    def get_dashboard_snapshot(self, symbol: str = None) -> Dict:
+        """Latest price, portfolio and manager status in a single round-trip."""
+        try:
+            result = self.conn.execute(
+                _SQL_DASHBOARD_SNAPSHOT, (symbol or config.SYMBOL,)
+            ).fetchone()
+            if result:
+                return {
+                    'price': float(result[0]) if result[0] is not None else None,
+                    'balance': result[1], 'positions': result[2],
+                    'action': result[3].upper(), 'reason': result[4]
+                }
+        except Exception as e:
+            print(f"[DB ERROR] get_dashboard_snapshot: {e}")
+        return {'price': None, 'balance': config.INITIAL_BALANCE, 'positions': 0,
+                'action': 'CONTINUE', 'reason': None}
+    
+    # ==================== CHANGE TRACKING ====================
+    
+    def get_change_sentinel(self) -> Optional[tuple]:
+        """
+        Cheap fingerprint of the mutable tables.
+        
+        Changes whenever a price or trade is written or the manager status
+        is updated, so pollers can skip refetching when nothing moved.
+        """
+        try:
+            return self.conn.execute(_SQL_CHANGE_SENTINEL).fetchone()
+        except Exception as e:
+            print(f"[DB ERROR] get_change_sentinel: {e}")
+            return None
+    
     def reset_db(self, confirm: bool = False) -> bool:
         """
         Reset all database tables to initial state.
@@ -257,7 +518,7 @@ class TradingDB:
             )
             self.conn.execute(
                 "INSERT INTO manager_status (id, action, timestamp) VALUES (1, 'CONTINUE', ?)",
-                (datetime.now().strftime('%Y-%m-%d %H:%M:%S'),)
+                (_now_ms(),)
             )
             
             self.conn.commit()
@@ -280,6 +541,7 @@ class TradingDB:
     
     def close(self):
         if self.conn:
+            self.flush_prices()
             self.conn.close()
             TradingDB._instance = None
             print("[DB] Connection closed")
@@ -8,6 +8,7 @@ Launches all services and displays real-time status.
 import os
 import sys
 import time
+import signal
 import subprocess
 from datetime import datetime
 from pathlib import Path
@@ -15,6 +16,8 @@ from pathlib import Path
 # Add parent dir to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+import orjson
+
 from config import config
 from db_client import TradingDB
 
@@ -29,9 +32,32 @@ SERVICES = [
 
 REFRESH_INTERVAL = 2
 
+# PIDs of launched services that are still running (kept by the SIGCHLD handler)
+_running = set()
+_HAS_SIGCHLD = hasattr(signal, 'SIGCHLD')
+
 
 def clear_screen():
-    os.system('cls' if os.name == 'nt' else 'clear')
+    sys.stdout.write('\x1b[2J\x1b[H')
+    sys.stdout.flush()
+
+
+def reap_services(signum=None, frame=None):
+    """SIGCHLD handler: drop exited services from the running set."""
+    for pid in list(_running):
+        try:
+            done, _ = os.waitpid(pid, os.WNOHANG)
+        except ChildProcessError:
+            done = pid
+        if done:
+            _running.discard(pid)
+
+
+def active_count(processes):
+    """Number of services still running."""
+    if _HAS_SIGCHLD:
+        return len(_running)
+    return sum(1 for _, p in processes if p.poll() is None)
 
 
 def start_services():
@@ -39,6 +65,9 @@ def start_services():
     processes = []
     project_root = Path(__file__).parent.parent
     
+    if _HAS_SIGCHLD:
+        signal.signal(signal.SIGCHLD, reap_services)
+    
     print("=" * 60)
     print("  GEMINI HFT - Starting Services")
     print("=" * 60)
@@ -46,17 +75,22 @@ def start_services():
     for name, script in SERVICES:
         try:
             script_path = project_root / script
+            # close_fds=False and no cwd keep subprocess on its posix_spawn path
             process = subprocess.Popen(
                 [sys.executable, str(script_path)],
                 stdout=subprocess.DEVNULL,
                 stderr=subprocess.DEVNULL,
-                cwd=str(project_root)
+                close_fds=False
             )
             processes.append((name, process))
+            _running.add(process.pid)
             print(f"  [✓] {name} (PID: {process.pid})")
         except Exception as e:
             print(f"  [✗] {name}: {e}")
     
+    # Catch any service that exited before its PID was registered
+    if _HAS_SIGCHLD:
+        reap_services()
     time.sleep(2)
     return processes
 
@@ -81,14 +115,17 @@ def stop_services(processes):
 
 def load_signal():
     """Load trade signal from JSON."""
-    import json
-    signal_file = Path(__file__).parent.parent / 'trade_signal.json'
-    if not signal_file.exists():
+    try:
+        return orjson.loads(Path(config.SIGNAL_FILE).read_bytes())
+    except (OSError, orjson.JSONDecodeError):
         return None
+
+
+def signal_mtime():
+    """Modification time of the signal file (None if missing)."""
     try:
-        with open(signal_file, 'r') as f:
-            return json.load(f)
-    except:
+        return os.stat(config.SIGNAL_FILE).st_mtime_ns
+    except OSError:
         return None
 
 
@@ -97,17 +134,15 @@ def display_dashboard(processes, db):
     clear_screen()
     
     # Get data
-    prices = db.get_latest_prices(limit=1)
-    portfolio = db.get_portfolio()
-    manager = db.get_manager_status_full()
-    signal = load_signal()
-    
-    price = float(prices.iloc[-1]['price']) if not prices.empty else 0
-    balance = portfolio['balance']
-    positions = portfolio['positions']
+    snapshot = db.get_dashboard_snapshot()
+    trade_signal = load_signal()
+    
+    price = snapshot['price'] or 0
+    balance = snapshot['balance']
+    positions = snapshot['positions']
     total_value = balance + (positions * price)
     
-    active = sum(1 for _, p in processes if p.poll() is None)
+    active = active_count(processes)
     
     # Display
     print()
@@ -115,17 +150,17 @@ def display_dashboard(processes, db):
     print("           GEMINI HFT COMMAND CENTER")
     print("=" * 60)
     print(f"  Status:  Active ({active}/{len(processes)} services)")
-    print(f"  Time:    {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print(f"  Updated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print("-" * 60)
     print(f"  Symbol:  {config.SYMBOL}")
     print(f"  Price:   ₹{price:,.2f}")
     print("-" * 60)
     
     # AI Signal
-    if signal:
-        confidence = signal.get('confidence', 0)
-        sig_type = signal.get('signal', 'N/A')
-        rsi = signal.get('rsi', 0)
+    if trade_signal:
+        confidence = trade_signal.get('confidence', 0)
+        sig_type = trade_signal.get('signal', 'N/A')
+        rsi = trade_signal.get('rsi', 0)
         print(f"  Signal:     {sig_type} ({confidence:.1%} confidence)")
         print(f"  RSI:        {rsi:.1f}")
     else:
@@ -136,15 +171,18 @@ def display_dashboard(processes, db):
     print(f"  Positions:  {positions}")
     print(f"  Net Worth:  ₹{total_value:,.2f}")
     print("-" * 60)
-    print(f"  Manager:    {manager['action']}")
-    if manager.get('reason'):
-        print(f"  Reason:     {manager['reason']}")
+    print(f"  Manager:    {snapshot['action']}")
+    if snapshot['reason']:
+        print(f"  Reason:     {snapshot['reason']}")
     print("=" * 60)
     print("\n  [Press Ctrl+C to Stop]")
 
 
 def run():
     """Main dashboard loop."""
+    if os.name == 'nt':
+        os.system('')  # enables ANSI escape handling in the Windows console
+    
     config.print_config()
     
     if not config.validate():
@@ -156,9 +194,17 @@ def run():
     
     processes = start_services()
     
+    # Only refetch and redraw when the DB, the signal file or the set of
+    # running services changed since the last frame.
+    last_state = None
+    
     try:
         while True:
-            display_dashboard(processes, db)
+            active = active_count(processes)
+            state = (db.get_change_sentinel(), signal_mtime(), active)
+            if state != last_state or state[0] is None:
+                display_dashboard(processes, db)
+                last_state = state
             time.sleep(REFRESH_INTERVAL)
     except KeyboardInterrupt:
         stop_services(processes)
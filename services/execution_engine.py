@@ -11,27 +11,39 @@ from pathlib import Path
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-import json
 import time
 import os
 from datetime import datetime
 
+import orjson
+
 from config import config
 from db_client import TradingDB
 
 
+# Last parsed signal, keyed by the file's mtime
+_signal_mtime = None
+_signal_cached = None
+
+
 def load_signal():
-    """Load trade signal from JSON."""
-    if not os.path.exists(config.SIGNAL_FILE):
+    """Load trade signal from JSON (re-parsed only when the file changes)."""
+    global _signal_mtime, _signal_cached
+    try:
+        mtime = os.stat(config.SIGNAL_FILE).st_mtime_ns
+    except FileNotFoundError:
         return None
-    with open(config.SIGNAL_FILE, 'r') as f:
-        return json.load(f)
+    
+    if mtime != _signal_mtime:
+        _signal_cached = orjson.loads(Path(config.SIGNAL_FILE).read_bytes())
+        _signal_mtime = mtime
+    return _signal_cached
 
 
 def get_current_price(db):
     """Get latest price from database."""
-    prices = db.get_latest_prices(limit=1)
-    return float(prices.iloc[-1]['price']) if not prices.empty else None
+    latest = db.get_latest_price_scalar(config.SYMBOL)
+    return latest[1] if latest else None
 
 
 def execute_buy(db, balance, positions, price, timestamp):
@@ -44,8 +56,7 @@ def execute_buy(db, balance, positions, price, timestamp):
     new_balance = balance - cost
     new_positions = positions + qty
     
-    db.log_trade('BUY', price, qty, new_balance)
-    db.update_portfolio(new_balance, new_positions, timestamp)
+    db.log_trade_and_update_portfolio('BUY', price, qty, new_balance, new_positions, timestamp)
     
     print(f"[BUY] {qty} @ {price:.2f} | Cost: {cost:.2f}")
     return new_balance, new_positions, True
@@ -59,8 +70,7 @@ def execute_sell(db, balance, positions, price, timestamp):
     revenue = positions * price
     new_balance = balance + revenue
     
-    db.log_trade('SELL', price, positions, new_balance)
-    db.update_portfolio(new_balance, 0, timestamp)
+    db.log_trade_and_update_portfolio('SELL', price, positions, new_balance, 0, timestamp)
     
     print(f"[SELL] {positions} @ {price:.2f} | Revenue: {revenue:.2f}")
     return new_balance, 0, True
@@ -79,7 +89,15 @@ def run():
     portfolio = db.get_portfolio()
     print(f"[INIT] Balance: {portfolio['balance']:.2f} | Positions: {portfolio['positions']}")
     
+    interval = config.EXECUTION_ENGINE_INTERVAL
+    
+    # Deadline-based pacing: time spent working doesn't stretch the cadence
+    next_tick = time.monotonic()
+    
     while True:
+        time.sleep(max(0, next_tick - time.monotonic()))
+        next_tick = max(next_tick + interval, time.monotonic())
+        
         try:
             portfolio = db.get_portfolio()
             balance = portfolio['balance']
@@ -90,7 +108,6 @@ def run():
             price = get_current_price(db)
             
             if not signal or not price:
-                time.sleep(config.EXECUTION_ENGINE_INTERVAL)
                 continue
             
             sig_type = signal.get('signal')
@@ -100,7 +117,6 @@ def run():
             # Anti-spam
             if sig_time == last_trade:
                 print(f"Balance: {balance:.2f} | Pos: {positions} | {sig_type} (traded)")
-                time.sleep(config.EXECUTION_ENGINE_INTERVAL)
                 continue
             
             # Manager check
@@ -108,7 +124,6 @@ def run():
             if manager_action == 'PAUSE':
                 status = db.get_manager_status_full()
                 print(f"[BLOCKED] {status.get('reason', 'Paused')}")
-                time.sleep(config.EXECUTION_ENGINE_INTERVAL)
                 continue
             
             # Execute trades
@@ -122,8 +137,6 @@ def run():
             
         except Exception as e:
             print(f"[ERROR] {e}")
-        
-        time.sleep(config.EXECUTION_ENGINE_INTERVAL)
 
 
 if __name__ == "__main__":
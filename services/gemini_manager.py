@@ -14,6 +14,8 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 import re
 import json
 import time
+import asyncio
+import functools
 from datetime import datetime
 
 import google.generativeai as genai
@@ -23,91 +25,125 @@ from db_client import TradingDB
 
 
 current_api_idx = 0
-current_model_idx = 0
 
+_JSON_START = re.compile(r'\{')
+_RATE_LIMIT = re.compile(r'rate|quota|429|exhausted', re.IGNORECASE)
+_NOT_FOUND = re.compile(r'404|not found', re.IGNORECASE)
+_DECODER = json.JSONDecoder()
 
-def configure_gemini():
-    """Configure Gemini with current API key and model."""
-    genai.configure(api_key=config.GEMINI_API_KEYS[current_api_idx])
-    return genai.GenerativeModel(config.GEMINI_MODELS[current_model_idx])
 
-
-def rotate_model():
-    """Rotate to next model."""
-    global current_model_idx
-    current_model_idx = (current_model_idx + 1) % len(config.GEMINI_MODELS)
+@functools.lru_cache(maxsize=len(config.GEMINI_API_KEYS) * len(config.GEMINI_MODELS))
+def get_model(api_idx, model_idx):
+    """Configure Gemini for a key and build the model (cached per key/model pair)."""
+    # The model picks up its client on its first request, which always runs
+    # straight after this call, so later configure() calls don't affect it.
+    genai.configure(api_key=config.GEMINI_API_KEYS[api_idx])
+    return genai.GenerativeModel(config.GEMINI_MODELS[model_idx])
 
 
 def rotate_api():
     """Rotate to next API key."""
-    global current_api_idx, current_model_idx
+    global current_api_idx
     current_api_idx = (current_api_idx + 1) % len(config.GEMINI_API_KEYS)
-    current_model_idx = 0
 
 
-def is_rate_limit(msg):
-    return any(k in str(msg).lower() for k in ['rate', 'quota', '429', 'exhausted'])
+# Static parts of the risk prompt, rendered once. Everything that doesn't
+# change per cycle (role, rules, examples) comes first so the byte-identical
+# prefix is as long as possible for the API's prefix cache.
+_PROMPT_PREFIX = f"""You are a Risk Manager.
 
+RULES:
+- If lost >{config.MAX_CAPITAL_LOSS_PERCENT}% capital OR >{config.MAX_TRADES_PER_10_MIN} trades in 10 min: PAUSE
+- Otherwise: CONTINUE
+- Return JSON only
 
-def is_not_found(msg):
-    return '404' in str(msg).lower() or 'not found' in str(msg).lower()
+Examples:
+{{"action": "CONTINUE"}}
+{{"action": "PAUSE", "reason": "High Risk"}}
 
+Review these trades:
 
-def parse_response(text):
-    """Extract JSON from Gemini response."""
-    try:
-        match = re.search(r'\{[^}]+\}', text)
-        if match:
-            data = json.loads(match.group().replace("'", '"'))
-            if 'action' in data:
-                action = data['action'].upper()
-                if action in ['CONTINUE', 'PAUSE']:
-                    return action, data.get('reason', '')
-        return 'CONTINUE', 'Parse fallback'
-    except:
-        return 'CONTINUE', 'Parse error'
+"""
+_PROMPT_SUFFIX = "Response:"
 
 
-def get_command(trades_summary, balance, positions):
-    """Get CONTINUE/PAUSE from Gemini."""
-    prompt = f"""You are a Risk Manager. Review these trades:
+def is_rate_limit(error):
+    # google.api_core errors carry the HTTP status; fall back to the message
+    return getattr(error, 'code', None) == 429 or bool(_RATE_LIMIT.search(str(error)))
 
-{trades_summary}
 
-Balance: ₹{balance:,.2f} | Positions: {positions}
+def is_not_found(error):
+    return getattr(error, 'code', None) == 404 or bool(_NOT_FOUND.search(str(error)))
 
-RULES:
-- If lost >{config.MAX_CAPITAL_LOSS_PERCENT}% capital OR >{config.MAX_TRADES_PER_10_MIN} trades in 10 min: PAUSE
-- Otherwise: CONTINUE
-- Return JSON only
 
-Examples:
-{{"action": "CONTINUE"}}
-{{"action": "PAUSE", "reason": "High Risk"}}
+def parse_response(text):
+    """
+    Extract the first JSON object with an action from a Gemini response
+    as (action, reason), or None if there isn't one.
+    """
+    # Models sometimes answer with Python-style single quotes
+    for candidate in (text, text.replace("'", '"')):
+        for match in _JSON_START.finditer(candidate):
+            try:
+                data, _ = _DECODER.raw_decode(candidate, match.start())
+            except ValueError:
+                continue
+            if isinstance(data, dict) and 'action' in data:
+                action = str(data['action']).upper()
+                if action in ['CONTINUE', 'PAUSE']:
+                    return action, data.get('reason', '')
+    return None
+
+
+async def ask_model(api_idx, model_idx, prompt):
+    """Query one key/model pair and parse its reply (None if it didn't parse)."""
+    model = get_model(api_idx, model_idx)
+    response = await model.generate_content_async(prompt)
+    return parse_response(response.text.strip())
+
 
-Response:"""
+async def get_command(trades_summary, balance, positions):
+    """Get CONTINUE/PAUSE from Gemini."""
+    prompt = [
+        _PROMPT_PREFIX,
+        f"{trades_summary}\n\nBalance: ₹{balance:,.2f} | Positions: {positions}\n\n",
+        _PROMPT_SUFFIX,
+    ]
 
-    attempts = len(config.GEMINI_API_KEYS) * len(config.GEMINI_MODELS)
+    rate_limited = False
     
-    for _ in range(attempts):
+    for _ in range(len(config.GEMINI_API_KEYS)):
+        # Race every model on the active key; the first reply that parses wins
+        pending = {
+            asyncio.create_task(ask_model(current_api_idx, model_idx, prompt))
+            for model_idx in range(len(config.GEMINI_MODELS))
+        }
+        unparsed = False
         try:
-            model = configure_gemini()
-            response = model.generate_content(prompt)
-            return parse_response(response.text.strip())
-        except Exception as e:
-            if is_not_found(str(e)):
-                rotate_model()
-            elif is_rate_limit(str(e)):
-                if current_model_idx < len(config.GEMINI_MODELS) - 1:
-                    rotate_model()
-                elif current_api_idx < len(config.GEMINI_API_KEYS) - 1:
-                    rotate_api()
-                else:
-                    return 'CONTINUE', 'All APIs exhausted'
-            else:
-                rotate_model()
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    error = task.exception()
+                    if error is None:
+                        result = task.result()
+                        if result is not None:
+                            return result
+                        unparsed = True
+                    elif is_rate_limit(error):
+                        rate_limited = True
+                    elif is_not_found(error):
+                        print(f"[MODEL NOT FOUND] {error}")
+        finally:
+            for task in pending:
+                task.cancel()
+        
+        # The key works, the models just didn't answer in the expected format
+        if unparsed:
+            return 'CONTINUE', 'Parse fallback'
+        
+        rotate_api()
     
-    return 'CONTINUE', 'Failed'
+    return 'CONTINUE', 'All APIs exhausted' if rate_limited else 'Failed'
 
 
 def run():
@@ -120,32 +156,42 @@ def run():
     db = TradingDB()
     db.init_db()
     
+    # One loop for the service lifetime: the async gRPC clients bind to it
+    loop = asyncio.new_event_loop()
+    
+    interval = config.GEMINI_MANAGER_INTERVAL
+    
+    # Deadline-based pacing: time spent working doesn't stretch the cadence
+    next_tick = time.monotonic()
+    
     while True:
+        time.sleep(max(0, next_tick - time.monotonic()))
+        next_tick = max(next_tick + interval, time.monotonic())
+        
         try:
             print(f"\n[CYCLE] {datetime.now().strftime('%H:%M:%S')}")
             
-            trades = db.get_recent_trades(10)
-            if trades.empty:
+            trades = db.get_recent_trade_rows(10)
+            if not trades:
                 db.set_manager_status('CONTINUE', 'No trades')
-                time.sleep(config.GEMINI_MANAGER_INTERVAL)
                 continue
             
-            trades_str = "\n".join([
-                f"{r['timestamp']} - {r['action']} @ ₹{r['price']}"
-                for _, r in trades.iterrows()
-            ])
+            trades_str = "\n".join(
+                f"{datetime.fromtimestamp(ts_ms / 1000):%Y-%m-%d %H:%M:%S} - {action} @ ₹{price}"
+                for ts_ms, action, price, _, _ in trades
+            )
             
             portfolio = db.get_portfolio()
             
-            action, reason = get_command(trades_str, portfolio['balance'], portfolio['positions'])
+            action, reason = loop.run_until_complete(
+                get_command(trades_str, portfolio['balance'], portfolio['positions'])
+            )
             db.set_manager_status(action, reason)
             
             print(f"[COMMAND] {action}" + (f" ({reason})" if reason else ""))
             
         except Exception as e:
             print(f"[ERROR] {e}")
-        
-        time.sleep(config.GEMINI_MANAGER_INTERVAL)
 
 
 if __name__ == "__main__":
@@ -11,6 +11,7 @@ from pathlib import Path
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+import signal
 import time
 from datetime import datetime
 
@@ -20,10 +21,14 @@ from config import config
 from db_client import TradingDB
 
 
+# One Ticker for the process lifetime; yfinance keeps its HTTP session (and
+# the TLS connection / cookie crumb) on it, so each poll reuses them.
+_ticker = yf.Ticker(config.SYMBOL)
+
+
 def fetch_latest_candle():
     """Fetch the latest 1-minute candle."""
-    ticker = yf.Ticker(config.SYMBOL)
-    df = ticker.history(period="1d", interval="1m")
+    df = _ticker.history(period="1d", interval="1m")
     
     if df.empty:
         return None
@@ -47,20 +52,33 @@ def run():
     db = TradingDB()
     db.init_db()
     
-    while True:
-        try:
-            candle = fetch_latest_candle()
-            
-            if candle:
-                db.log_price(candle['symbol'], candle['price'], candle['volume'])
-                print(f"[{datetime.now().strftime('%H:%M:%S')}] Price: {candle['price']}")
-            else:
-                print("[SKIP] No data")
+    # The dashboard stops services with SIGTERM; turn it into SystemExit so
+    # buffered ticks are flushed below.
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    
+    try:
+        interval = config.MARKET_FEEDER_INTERVAL
         
-        except Exception as e:
-            print(f"[ERROR] {e}")
+        # Deadline-based pacing: time spent working doesn't stretch the cadence
+        next_tick = time.monotonic()
         
-        time.sleep(config.MARKET_FEEDER_INTERVAL)
+        while True:
+            time.sleep(max(0, next_tick - time.monotonic()))
+            next_tick = max(next_tick + interval, time.monotonic())
+            
+            try:
+                candle = fetch_latest_candle()
+                
+                if candle:
+                    db.log_price(candle['symbol'], candle['price'], candle['volume'])
+                    print(f"[{datetime.now().strftime('%H:%M:%S')}] Price: {candle['price']}")
+                else:
+                    print("[SKIP] No data")
+            
+            except Exception as e:
+                print(f"[ERROR] {e}")
+    finally:
+        db.flush_prices()
 
 
 if __name__ == "__main__":
@@ -11,161 +11,653 @@ from pathlib import Path
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-import json
+import os
+import shutil
+import tempfile
 import time
-from datetime import datetime
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import date, datetime, timezone
 
+import numpy as np
+import orjson
 import pandas as pd
 import yfinance as yf
-from ta.momentum import RSIIndicator
-from ta.trend import SMAIndicator
-from xgboost import XGBClassifier
+import xgboost as xgb
 
 from config import config
 from db_client import TradingDB
 
+try:
+    import tl2cgen
+    import treelite
+except ImportError:  # optional, only used with INFERENCE_BACKEND=treelite
+    tl2cgen = treelite = None
+
+try:
+    import onnxruntime as ort
+    from onnxmltools import convert_xgboost
+    from onnxmltools.convert.common.data_types import FloatTensorType
+except ImportError:  # optional, only used with INFERENCE_BACKEND=onnx
+    ort = None
+
+try:
+    import numba
+    from numba import prange
+except ImportError:  # optional, only used to speed up the warmup RSI
+    numba = None
+    prange = range
+
+if config.MODEL_KIND == 'sgd':  # only the streaming linear model uses sklearn
+    from sklearn.linear_model import SGDClassifier
+    from sklearn.preprocessing import StandardScaler
+
+try:
+    import cupy as cp
+except ImportError:  # optional, only used for GPU training
+    cp = None
+
+
+FEATURE_COLS = ['RSI', 'SMA', 'Close', 'Volume']
+BAR_COLS = ['Close', 'Volume']
+
+XGB_PARAMS = {
+    'max_depth': config.XGBOOST_MAX_DEPTH,
+    'learning_rate': config.XGBOOST_LEARNING_RATE,
+    'tree_method': 'hist',
+    'max_bin': config.XGBOOST_MAX_BIN,
+    # A few hundred rows: thread-pool start-up costs more than it saves
+    'nthread': 1,
+    'objective': 'binary:logistic',
+    'eval_metric': 'logloss',
+    'verbosity': 0,
+    'seed': 42,
+}
+
+# Train on the GPU when this xgboost build has CUDA and cupy is available
+USE_GPU = cp is not None and bool(xgb.build_info().get('USE_CUDA'))
+if USE_GPU:
+    XGB_PARAMS['device'] = 'cuda'
+
+# Reused input row for single-bar prediction
+_latest = np.empty((1, len(FEATURE_COLS)), dtype=np.float32)
+
+
+def to_bars(rows):
+    """
+    Convert (timestamp, price, volume) rows to column arrays
+    ('Timestamp' in epoch ms, prices and volume as float32).
+    """
+    timestamps, prices, volumes = zip(*rows)
+    return {
+        'Timestamp': np.array(timestamps, dtype=np.int64),
+        'Close': np.array(prices, dtype=np.float32),
+        'Volume': np.array(volumes, dtype=np.float32),
+    }
+
 
 def load_market_data(db):
-    """Load market data from database."""
-    df = db.get_latest_prices(limit=500, symbol=config.SYMBOL)
-    if df.empty:
-        return None
+    """Load the latest TRAINING_WINDOW bars from the database."""
+    rows = db.get_latest_price_rows(config.TRAINING_WINDOW, config.SYMBOL)
+    return to_bars(rows) if rows else None
+
+
+def load_new_bars(db, since_ms):
+    """Load only the bars stored after since_ms."""
+    rows = db.get_prices_since(since_ms, config.SYMBOL)
+    return to_bars(rows) if rows else None
+
+
+def fetch_history():
+    """
+    7 days of 1-minute bars for the symbol, cached to parquet once per day
+    so restarts don't hit yfinance again.
+    """
+    cache_dir = Path(config.WARMUP_CACHE_DIR)
+    cache_file = cache_dir / f"{config.SYMBOL}_{date.today():%Y%m%d}.parquet"
+    
+    if cache_file.exists() and time.time() - cache_file.stat().st_mtime < 86400:
+        try:
+            return pd.read_parquet(cache_file)
+        except Exception as e:
+            print(f"[WARMUP] Cache unreadable: {e}")
     
-    df = df.rename(columns={'timestamp': 'Datetime', 'price': 'Close', 'volume': 'Volume'})
-    df['Open'] = df['High'] = df['Low'] = df['Close']
-    return df
+    hist = yf.Ticker(config.SYMBOL).history(period="7d", interval="1m")
+    if not hist.empty:
+        try:
+            cache_dir.mkdir(exist_ok=True)
+            for old in cache_dir.glob(f"{config.SYMBOL}_*.parquet"):
+                old.unlink()
+            hist.to_parquet(cache_file)
+        except Exception as e:  # e.g. no parquet engine installed
+            print(f"[WARMUP] Not caching history: {e}")
+    return hist
 
 
-def warmup_data(df):
+def warmup_data(bars):
     """Fetch historical data if needed."""
-    current_len = len(df) if df is not None else 0
+    current_len = len(bars['Timestamp']) if bars is not None else 0
     
     if current_len >= config.MIN_TRAINING_ROWS:
-        return df
+        return bars
     
-    print(f"[WARMUP] Fetching historical data...")
+    print(f"[WARMUP] Loading historical data...")
     try:
-        ticker = yf.Ticker(config.SYMBOL)
-        hist = ticker.history(period="7d", interval="1m")
+        hist = fetch_history()
         
         if hist.empty:
-            return df
+            return bars
         
-        hist = hist.reset_index()
-        if 'Date' in hist.columns:
-            hist = hist.rename(columns={'Date': 'Datetime'})
-        elif 'index' in hist.columns:
-            hist = hist.rename(columns={'index': 'Datetime'})
+        warm = {'Timestamp': pd.to_datetime(hist.index, utc=True).as_unit('ms').asi8}
+        for col in BAR_COLS:
+            warm[col] = hist[col].to_numpy(np.float32)
         
-        hist['Datetime'] = pd.to_datetime(hist['Datetime'], utc=True)
-        hist = hist[['Datetime', 'Open', 'High', 'Low', 'Close', 'Volume']]
+        if bars is None:
+            return warm
         
-        if df is not None and not df.empty:
-            df['Datetime'] = pd.to_datetime(df['Datetime'], utc=True)
-            combined = pd.concat([hist, df], ignore_index=True)
-            combined = combined.drop_duplicates(subset=['Datetime'], keep='last')
-            return combined.sort_values('Datetime').reset_index(drop=True)
-        return hist
+        # Both sides are time-ordered: database bars overwrite the history bar
+        # with the same timestamp and the rest are inserted in place
+        hist_ts, new_ts = warm['Timestamp'], bars['Timestamp']
+        pos = np.searchsorted(hist_ts, new_ts)
+        dup = pos < len(hist_ts)
+        dup[dup] = hist_ts[pos[dup]] == new_ts[dup]
+        
+        merged = {'Timestamp': np.insert(hist_ts, pos[~dup], new_ts[~dup])}
+        for col in BAR_COLS:
+            values = warm[col]
+            values[pos[dup]] = bars[col][dup]
+            merged[col] = np.insert(values, pos[~dup], bars[col][~dup])
+        return merged
     except Exception as e:
         print(f"[WARMUP ERROR] {e}")
-        return df
+        return bars
+
+
+def wilder_averages(close, window):
+    """Wilder (RMA) averages of gains and losses, as used by the RSI."""
+    delta = close.diff()
+    gain = delta.where(delta > 0, 0.0)
+    loss = -delta.where(delta < 0, 0.0)
+    avg_gain = gain.ewm(alpha=1 / window, min_periods=window, adjust=False).mean()
+    avg_loss = loss.ewm(alpha=1 / window, min_periods=window, adjust=False).mean()
+    return avg_gain, avg_loss
 
 
-def engineer_features(df):
-    """Calculate technical indicators."""
-    df = df.copy()
-    df['RSI'] = RSIIndicator(close=df['Close'], window=config.RSI_WINDOW).rsi()
-    df['SMA'] = SMAIndicator(close=df['Close'], window=config.SMA_WINDOW).sma_indicator()
-    return df.dropna().reset_index(drop=True)
+def rsi_wilder(close, window):
+    """Wilder RSI (RMA-smoothed), matching ta.momentum.RSIIndicator."""
+    avg_gain, avg_loss = wilder_averages(close, window)
+    rsi = 100 - 100 / (1 + avg_gain / avg_loss)
+    return rsi.where(avg_loss != 0, 100.0)
 
 
-def train_and_predict(df):
-    """Train model and predict signal."""
-    feature_cols = ['RSI', 'SMA', 'Close', 'High', 'Low', 'Volume']
+def wilder_rsi_batch(close2d, n):
+    """
+    Wilder RSI for every row of a (n_symbols, n_bars) float64 close array,
+    same values as rsi_wilder(). Rows run in parallel when numba is installed.
+    """
+    n_symbols, n_bars = close2d.shape
+    out = np.full((n_symbols, n_bars), np.nan, dtype=np.float32)
+    alpha = 1.0 / n
+    for s in prange(n_symbols):
+        avg_gain = 0.0
+        avg_loss = 0.0
+        for t in range(1, n_bars):
+            delta = close2d[s, t] - close2d[s, t - 1]
+            avg_gain += alpha * (max(delta, 0.0) - avg_gain)
+            avg_loss += alpha * (max(-delta, 0.0) - avg_loss)
+            if t >= n - 1:
+                if avg_loss == 0:
+                    out[s, t] = 100.0
+                else:
+                    out[s, t] = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+    return out
+
+
+if numba is not None:
+    wilder_rsi_batch = numba.njit(parallel=True, cache=True)(wilder_rsi_batch)
+
+
+def engineer_features(bars):
+    """Calculate technical indicators over the whole window (warmup only)."""
+    close = pd.Series(bars['Close'], dtype=np.float64)
+    if numba is not None:
+        rsi = wilder_rsi_batch(close.to_numpy()[np.newaxis, :], config.RSI_WINDOW)[0]
+    else:
+        rsi = rsi_wilder(close, config.RSI_WINDOW).to_numpy(np.float32)
+    sma = close.rolling(config.SMA_WINDOW).mean().to_numpy(np.float32)
     
-    # Create target
-    df_train = df.copy()
-    df_train['Target'] = (df_train['Close'].shift(-1) > df_train['Close']).astype(int)
-    df_train = df_train[:-1]
+    # Did the next close go up? Unknown (0) for the newest bar until it has a successor
+    target = np.zeros(len(close), dtype=np.int8)
+    target[:-1] = bars['Close'][1:] > bars['Close'][:-1]
+    
+    valid = ~(np.isnan(rsi) | np.isnan(sma))
+    features = {col: values[valid] for col, values in bars.items()}
+    features['RSI'] = rsi[valid]
+    features['SMA'] = sma[valid]
+    features['Target'] = target[valid]
+    return features
+
+
+@dataclass
+class FeatureState:
+    """
+    Running RSI/SMA state, so each new bar costs O(1) instead of a full recompute.
     
-    if len(df_train) < 50:
-        return None
+    Seeded from the warmup history; update() then applies Wilder's recurrence
+    avg = avg*(n-1)/n + x/n and a rolling sum over the last SMA_WINDOW closes.
+    """
+    last_ts: int
+    last_close: float
+    rsi_avg_gain: float
+    rsi_avg_loss: float
+    sma_sum: float
+    sma_closes: deque
     
-    X, y = df_train[feature_cols], df_train['Target']
+    @classmethod
+    def from_history(cls, bars):
+        """Build the state from the raw (pre-feature) history bars."""
+        close = pd.Series(bars['Close'], dtype=np.float64)
+        avg_gain, avg_loss = wilder_averages(close, config.RSI_WINDOW)
+        closes = deque(close.iloc[-config.SMA_WINDOW:], maxlen=config.SMA_WINDOW)
+        return cls(
+            last_ts=int(bars['Timestamp'][-1]),
+            last_close=float(close.iloc[-1]),
+            rsi_avg_gain=float(avg_gain.iloc[-1]),
+            rsi_avg_loss=float(avg_loss.iloc[-1]),
+            sma_sum=sum(closes),
+            sma_closes=closes,
+        )
+    
+    def update(self, timestamp, close):
+        """Advance by one bar and return its (RSI, SMA)."""
+        n = config.RSI_WINDOW
+        delta = close - self.last_close
+        self.rsi_avg_gain = (self.rsi_avg_gain * (n - 1) + max(delta, 0.0)) / n
+        self.rsi_avg_loss = (self.rsi_avg_loss * (n - 1) + max(-delta, 0.0)) / n
+        
+        self.sma_sum += close - self.sma_closes[0]
+        self.sma_closes.append(close)
+        
+        self.last_ts = timestamp
+        self.last_close = close
+        
+        if self.rsi_avg_loss == 0:
+            rsi = 100.0
+        else:
+            rsi = 100 - 100 / (1 + self.rsi_avg_gain / self.rsi_avg_loss)
+        return rsi, self.sma_sum / config.SMA_WINDOW
+
+
+class FeatureWindow:
+    """
+    The last `size` feature rows, kept in preallocated column arrays.
     
-    model = XGBClassifier(
-        n_estimators=config.XGBOOST_ESTIMATORS,
-        max_depth=config.XGBOOST_MAX_DEPTH,
-        learning_rate=config.XGBOOST_LEARNING_RATE,
-        objective='binary:logistic',
-        eval_metric='logloss',
-        use_label_encoder=False,
-        verbosity=0,
-        random_state=42
-    )
-    model.fit(X, y)
+    Rows are appended into buffers twice the window size; when they fill up
+    the newest rows are moved back to the front, so view() is always a
+    contiguous slice and nothing is reallocated per cycle.
+    """
     
-    # Predict on latest
-    latest = df.iloc[-1:][feature_cols]
-    pred = model.predict(latest)[0]
-    proba = model.predict_proba(latest)[0]
+    def __init__(self, size, dtypes):
+        self.size = size
+        self._cols = {col: np.empty(2 * size, dtype=dtype) for col, dtype in dtypes.items()}
+        self._start = 0
+        self._end = 0
     
-    timestamp = df.iloc[-1]['Datetime']
-    if isinstance(timestamp, pd.Timestamp):
-        timestamp = timestamp.strftime('%Y-%m-%d %H:%M:%S')
+    def __len__(self):
+        return self._end - self._start
+    
+    def extend(self, rows):
+        """Append column arrays of equal length."""
+        n = len(rows['Timestamp'])
+        if n >= self.size:
+            rows = {col: values[-self.size:] for col, values in rows.items()}
+            n = self.size
+            self._start = self._end = 0
+        elif self._end + n > 2 * self.size:
+            keep = min(len(self), self.size - n)
+            for values in self._cols.values():
+                values[:keep] = values[self._end - keep:self._end]
+            self._start, self._end = 0, keep
+        
+        for col, values in self._cols.items():
+            values[self._end:self._end + n] = rows[col]
+        self._end += n
+        self._start = max(self._start, self._end - self.size)
+    
+    def set_last(self, col, value):
+        """Overwrite one column of the newest row."""
+        self._cols[col][self._end - 1] = value
+    
+    def view(self):
+        """Column views over the rows currently in the window."""
+        return {col: values[self._start:self._end] for col, values in self._cols.items()}
+
+
+def update_features(window, state, bars):
+    """Compute features for bars newer than the state and append them to the window."""
+    new = bars['Timestamp'] > state.last_ts
+    added = int(np.count_nonzero(new))
+    if not added:
+        return 0
+    
+    appended = {col: values[new] for col, values in bars.items()}
+    appended['RSI'] = np.empty(added, dtype=np.float32)
+    appended['SMA'] = np.empty(added, dtype=np.float32)
+    went_up = np.empty(added, dtype=np.int8)
+    for i, (ts, close) in enumerate(zip(appended['Timestamp'].tolist(), appended['Close'].tolist())):
+        went_up[i] = close > state.last_close
+        appended['RSI'][i], appended['SMA'][i] = state.update(ts, close)
+    
+    # Each new close labels the bar before it; the newest bar stays unlabelled
+    window.set_last('Target', went_up[0])
+    appended['Target'] = np.append(went_up[1:], np.int8(0))
+    window.extend(appended)
+    return added
+
+
+def feature_matrix(features):
+    """Stack the model inputs into a 2-D float32 array (rows x FEATURE_COLS)."""
+    return np.column_stack([features[col] for col in FEATURE_COLS])
+
+
+# Compiled predictor (treelite library / ONNX session) for the most recently
+# trained booster
+_compiled = {'booster': None, 'predictor': None, 'dir': None}
+
+
+def treelite_predictor(booster):
+    """Compile the booster to a native library (once per trained model)."""
+    if _compiled['booster'] is not booster:
+        lib_dir = tempfile.mkdtemp(prefix='hft_model_')
+        libpath = os.path.join(lib_dir, 'libmodel.so')
+        tl2cgen.export_lib(
+            treelite.frontend.from_xgboost(booster),
+            toolchain='gcc', libpath=libpath, params={'parallel_comp': 1}
+        )
+        if _compiled['dir']:
+            shutil.rmtree(_compiled['dir'], ignore_errors=True)
+        _compiled.update(booster=booster, predictor=tl2cgen.Predictor(libpath, nthread=1), dir=lib_dir)
+    return _compiled['predictor']
+
+
+def onnx_session(booster):
+    """Convert the booster to ONNX and open a single-threaded session (once per model)."""
+    if _compiled['booster'] is not booster:
+        # The ONNX converter only understands XGBoost's default f0..fN names
+        unnamed = booster.copy()
+        unnamed.feature_names = None
+        onnx_model = convert_xgboost(
+            unnamed, initial_types=[('input', FloatTensorType([None, booster.num_features()]))]
+        )
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.intra_op_num_threads = 1
+        session = ort.InferenceSession(
+            onnx_model.SerializeToString(), options, providers=['CPUExecutionProvider']
+        )
+        _compiled.update(booster=booster, predictor=session, dir=None)
+    return _compiled['predictor']
+
+
+@dataclass
+class LinearModel:
+    """
+    Streaming logistic regression for MODEL_KIND=sgd.
+    
+    Features are standardised (centred: Close/SMA sit far from zero) and the
+    scaler is folded into coef/intercept after every update, so a prediction
+    is one dot product. A small constant step keeps single-pass updates from
+    driving the weights, and the probabilities, to the extremes.
+    """
+    scaler: 'StandardScaler' = field(default_factory=lambda: StandardScaler())
+    clf: 'SGDClassifier' = field(default_factory=lambda: SGDClassifier(
+        loss='log_loss', alpha=1e-3, learning_rate='constant', eta0=0.01, random_state=42
+    ))
+    coef: np.ndarray = None
+    intercept: float = 0.0
+    
+    def partial_fit(self, X, y):
+        self.scaler.partial_fit(X)
+        self.clf.partial_fit(self.scaler.transform(X), y, classes=[0, 1])
+        coef = self.clf.coef_[0] / self.scaler.scale_
+        self.coef = coef.astype(np.float32)
+        self.intercept = float(self.clf.intercept_[0] - coef @ self.scaler.mean_)
+
+
+def predict_up_probability(model, latest):
+    """Probability that the next close is higher, for a single feature row."""
+    if config.MODEL_KIND == 'sgd':
+        return float(1.0 / (1.0 + np.exp(-(latest[0] @ model.coef + model.intercept))))
+    if config.INFERENCE_BACKEND == 'treelite' and treelite is not None:
+        predictor = treelite_predictor(model)
+        out = predictor.predict(tl2cgen.DMatrix(latest))
+        return float(np.ravel(out)[0])
+    if config.INFERENCE_BACKEND == 'onnx' and ort is not None:
+        session = onnx_session(model)
+        _, probabilities = session.run(None, {'input': latest})
+        return float(probabilities[0][1])
+    return float(model.inplace_predict(latest)[0])
+
+
+def needs_training(features, model, trained_until):
+    """
+    True when there is no model yet or enough new labelled bars arrived
+    (RETRAIN_INTERVAL for XGBoost, every bar for the SGD model).
+    """
+    if model is None:
+        return True
+    # The newest bar has no next close yet, so it can't be a training row
+    new_rows = int(np.count_nonzero(features['Timestamp'] > trained_until)) - 1
+    return new_rows >= (1 if config.MODEL_KIND == 'sgd' else config.RETRAIN_INTERVAL)
+
+
+def training_rows(features):
+    """Feature matrix, next-bar-up target and timestamps of the labelled rows."""
+    return feature_matrix(features)[:-1], features['Target'][:-1], features['Timestamp'][:-1]
+
+
+def train_linear(features, model=None, trained_until=None):
+    """
+    Update the SGD model with the bars after trained_until (the whole window
+    for a new model). Returns the model and the last training timestamp.
+    """
+    train, target, timestamps = training_rows(features)
+    
+    if model is None:
+        model = LinearModel()
+    else:
+        new = timestamps > trained_until
+        train, target = train[new], target[new]
+    
+    model.partial_fit(train, target)
+    return model, int(timestamps[-1])
+
+
+def train_model(features, booster=None, trained_until=None):
+    """
+    Fit the model on the window, or extend an existing one.
+    
+    With a previous booster, RETRAIN_TREES trees are boosted on top of it
+    using only the bars after trained_until (warm start). Once the ensemble
+    would exceed XGBOOST_MAX_TREES it is refitted from scratch instead.
+    
+    Returns the booster and the timestamp (epoch ms) of the last training row.
+    """
+    if config.MODEL_KIND == 'sgd':
+        return train_linear(features, booster, trained_until)
+    
+    train, target, timestamps = training_rows(features)
+    
+    if booster is not None and booster.num_boosted_rounds() + config.RETRAIN_TREES > config.XGBOOST_MAX_TREES:
+        booster = None
+    
+    if booster is None:
+        rounds = config.XGBOOST_ESTIMATORS
+    else:
+        new = timestamps > trained_until
+        train, target = train[new], target[new]
+        rounds = config.RETRAIN_TREES
+    
+    if USE_GPU:
+        train, target = cp.asarray(train), cp.asarray(target)
+    
+    dtrain = xgb.DMatrix(train, label=target, feature_names=FEATURE_COLS)
+    booster = xgb.train(XGB_PARAMS, dtrain, num_boost_round=rounds, xgb_model=booster)
+    # Single-row predictions are dominated by thread start-up (or a host-to-device
+    # copy), not the trees, so predict on one CPU thread
+    booster.set_param({'nthread': 1, 'device': 'cpu'})
+    save_booster(booster, int(timestamps[-1]))
+    return booster, int(timestamps[-1])
+
+
+def save_booster(booster, trained_until):
+    """Persist the booster in XGBoost's native UBJSON format, with its trained_until."""
+    try:
+        booster.set_attr(trained_until=str(trained_until))
+        tmp_file = config.MODEL_FILE + '.tmp.ubj'
+        booster.save_model(tmp_file)
+        os.replace(tmp_file, config.MODEL_FILE + '.ubj')
+    except Exception as e:
+        print(f"[WARN] Could not save model: {e}")
+
+
+def load_booster():
+    """
+    The saved booster and its trained_until, if it is younger than
+    RETRAIN_INTERVAL bars and matches the current features; else (None, None).
+    """
+    model_file = config.MODEL_FILE + '.ubj'
+    max_age = config.RETRAIN_INTERVAL * config.MARKET_FEEDER_INTERVAL
+    try:
+        if time.time() - os.path.getmtime(model_file) > max_age:
+            return None, None
+        booster = xgb.Booster(model_file=model_file)
+    except (OSError, xgb.core.XGBoostError):
+        return None, None
+    
+    trained_until = booster.attr('trained_until')
+    if booster.feature_names != FEATURE_COLS or trained_until is None:
+        return None, None
+    
+    booster.set_param({'nthread': 1, 'device': 'cpu'})
+    return booster, int(trained_until)
+
+
+def predict_signal(model, features):
+    """Predict the signal for the latest bar."""
+    for i, col in enumerate(FEATURE_COLS):
+        _latest[0, i] = features[col][-1]
+    p_up = predict_up_probability(model, _latest)
+    pred = 1 if p_up >= 0.5 else 0
+    
+    timestamp = datetime.fromtimestamp(features['Timestamp'][-1] / 1000, timezone.utc)
     
     return {
-        "timestamp": str(timestamp),
+        "timestamp": timestamp.strftime('%Y-%m-%d %H:%M:%S'),
         "signal": "BUY" if pred == 1 else "SELL",
-        "confidence": round(float(proba[pred]), 4),
-        "rsi": round(float(df.iloc[-1]['RSI']), 2)
+        "confidence": round(p_up if pred else 1 - p_up, 4),
+        "rsi": round(float(features['RSI'][-1]), 2)
     }
 
 
 def save_signal(signal):
-    """Save signal to JSON file."""
-    with open(config.SIGNAL_FILE, 'w') as f:
-        json.dump(signal, f, indent=2)
+    """Save signal to JSON file (atomic replace, readers never see a partial write)."""
+    tmp_file = config.SIGNAL_FILE + '.tmp'
+    with open(tmp_file, 'wb') as f:
+        f.write(orjson.dumps(signal))
+    os.replace(tmp_file, config.SIGNAL_FILE)
     print(f"[SIGNAL] {signal['signal']} ({signal['confidence']:.1%})")
 
 
+def _warmup_libs():
+    """
+    Pay the first-call costs (libxgboost/OpenMP or sklearn, numba JIT, pandas
+    tz data) with a throwaway fit/predict before the first real cycle.
+    """
+    rng = np.random.default_rng(0)
+    X = rng.random((20, len(FEATURE_COLS)), dtype=np.float32)
+    y = (X[:, 0] > 0.5).astype(np.float32)
+    
+    if config.MODEL_KIND == 'sgd':
+        LinearModel().partial_fit(X, y)
+    else:
+        booster = xgb.train(XGB_PARAMS, xgb.DMatrix(X, label=y), num_boost_round=2)
+        booster.inplace_predict(X[:1])
+    
+    wilder_rsi_batch(rng.random((1, 20)), config.RSI_WINDOW)
+    pd.to_datetime('2020-01-01', utc=True)
+    print("[STARTUP] warmup complete")
+
+
 def run():
     """Main service loop."""
     print("=" * 60)
     print("  SERVICE 2: QUANT ENGINE")
-    print(f"  Model: XGBoost | RSI({config.RSI_WINDOW}) SMA({config.SMA_WINDOW})")
+    if config.MODEL_KIND == 'sgd':
+        print(f"  Model: SGD logistic | RSI({config.RSI_WINDOW}) SMA({config.SMA_WINDOW})")
+    else:
+        print(f"  Model: XGBoost ({'GPU' if USE_GPU else 'CPU'}) | RSI({config.RSI_WINDOW}) SMA({config.SMA_WINDOW})")
     print("=" * 60)
     
+    if config.INFERENCE_BACKEND == 'treelite' and treelite is None:
+        print("[WARN] treelite/tl2cgen not installed - using XGBoost predict")
+    if config.INFERENCE_BACKEND == 'onnx' and ort is None:
+        print("[WARN] onnxruntime/onnxmltools not installed - using XGBoost predict")
+    
+    _warmup_libs()
     db = TradingDB()
     
-    while True:
+    interval = config.QUANT_ENGINE_INTERVAL
+    
+    # Model and feature state carried across cycles; a fresh saved booster
+    # skips the first fit and is warm-started from then on
+    model, trained_until = (None, None) if config.MODEL_KIND == 'sgd' else load_booster()
+    if model is not None:
+        print(f"[MODEL] Resumed saved booster ({model.num_boosted_rounds()} trees)")
+    state = None
+    window = None
+    
+    # One cycle per new tick, but never closer together than the interval
+    next_cycle = time.monotonic()
+    for _ in db.listen_prices(config.SYMBOL, config.QUANT_POLL_INTERVAL):
+        time.sleep(max(0.0, next_cycle - time.monotonic()))
+        next_cycle = time.monotonic() + interval
+        
         try:
             print(f"\n[CYCLE] {datetime.now().strftime('%H:%M:%S')}")
             
-            df = load_market_data(db)
-            if df is None or df.empty:
-                print("[WAIT] No data")
-                time.sleep(config.QUANT_ENGINE_INTERVAL)
-                continue
-            
-            df = warmup_data(df)
-            if df is None or len(df) < 50:
-                time.sleep(config.QUANT_ENGINE_INTERVAL)
-                continue
+            if state is None:
+                bars = warmup_data(load_market_data(db))
+                if bars is None or len(bars['Timestamp']) < 50:
+                    continue
+                
+                features = engineer_features(bars)
+                if len(features['Timestamp']) < 51:
+                    continue
+                
+                window = FeatureWindow(
+                    config.TRAINING_WINDOW, {col: values.dtype for col, values in features.items()}
+                )
+                window.extend(features)
+                state = FeatureState.from_history(bars)
+            else:
+                bars = load_new_bars(db, state.last_ts)
+                if bars is None or not update_features(window, state, bars):
+                    print("[WAIT] No new bars")
+                    continue
             
-            df = engineer_features(df)
-            if len(df) < 50:
-                time.sleep(config.QUANT_ENGINE_INTERVAL)
-                continue
+            features = window.view()
+            if needs_training(features, model, trained_until):
+                model, trained_until = train_model(features, model, trained_until)
+                if config.MODEL_KIND == 'sgd':
+                    print("[TRAIN] SGD update")
+                else:
+                    print(f"[TRAIN] {model.num_boosted_rounds()} trees")
             
-            signal = train_and_predict(df)
-            if signal:
-                save_signal(signal)
+            save_signal(predict_signal(model, features))
             
         except Exception as e:
             print(f"[ERROR] {e}")
-        
-        time.sleep(config.QUANT_ENGINE_INTERVAL)
 
 
 if __name__ == "__main__":